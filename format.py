@@ -1,19 +1,72 @@
 #!/usr/bin/env python3
 # coding: utf-8
 import re
+from bisect import bisect_right
+from itertools import accumulate
 from pathlib import Path
 from typing import Union, List
 
-# Import the read function from the sibling module
+# Import the page iterator from the sibling module (the script directory is on
+# sys.path when run as `python main.py`)
+from read import iter_pages
+
+# Optional linear-time regex engine for the hot MAWB/total scans
+# (pip install google-re2); falls back to the stdlib engine.
 try:
-    from read import read
-except Exception:
-    # fallback: try import via importlib if direct import fails
-    import importlib.util
-    spec = importlib.util.spec_from_file_location('rmod', Path(__file__).parent / 'read.py')
-    rmod = importlib.util.module_from_spec(spec)
-    spec.loader.exec_module(rmod)
-    read = getattr(rmod, 'read')
+    import re2 as _re_fast
+except ImportError:
+    _re_fast = re
+
+# name of the engine behind the fast patterns ('re2' or 're'); results can
+# differ between engines, so callers caching results should record it
+REGEX_ENGINE = _re_fast.__name__
+
+# Patterns used by the extractors below, compiled once at import time.
+# hyphen-sourced MAWB candidate: >=3 digits, optional spaces, '-', >=8 digits.
+# RE2 has no lookarounds; none are needed because both groups are greedy digit
+# runs, so a match always starts and ends on a digit-run boundary.
+# Spaces never include '\n' so a whole page can be scanned as one
+# newline-joined buffer without matches crossing lines (a normalized line
+# never contains '\n' itself).
+_MAWB_PATTERN = r"(\d{3,})[^\S\n]*-[^\S\n]*(\d{8,})"
+# fallback: contiguous long digit runs
+_DIGIT_RUN_PATTERN = r"\d{11,}"
+# multiline and newline-free spacing for the same per-page buffer scan
+_TOTAL_PATTERN = r"(?im)\btotal\b[^\S\n]*[:\-]?[^\S\n]*(.+)$"
+
+# In RE2, \d, \b and \s are ASCII-only, while stdlib re matches Unicode digits
+# (e.g. fullwidth '１２３'), word chars and spaces. On ASCII text both engines
+# give the same matches, so each pattern is compiled for both and the fast one
+# is only used when the text is ASCII (str.isascii() is O(1)); non-ASCII text
+# keeps the stdlib semantics regardless of whether google-re2 is installed.
+_MAWB_RE = _re_fast.compile(_MAWB_PATTERN)
+_MAWB_RE_UNICODE = re.compile(_MAWB_PATTERN)
+_DIGIT_RUN_RE = _re_fast.compile(_DIGIT_RUN_PATTERN)
+_DIGIT_RUN_RE_UNICODE = re.compile(_DIGIT_RUN_PATTERN)
+_TOTAL_RE = _re_fast.compile(_TOTAL_PATTERN)
+_TOTAL_RE_UNICODE = re.compile(_TOTAL_PATTERN)
+_AMOUNT_RE = re.compile(
+    r"(?P<symbol>[€£¥$])?\s*(?P<number>[0-9][0-9,]*(?:\.[0-9]{1,2})?)\s*(?P<code>[A-Za-z]{3})?",
+    re.I,
+)
+_WS_RE = re.compile(r"\s+")
+
+# Single translate table for character-level normalization: non-breaking space
+# becomes a normal space, zero-width/BOM are dropped and every hyphen/minus
+# variant becomes ASCII '-'.
+_NORM_TABLE = str.maketrans({
+    '\u00A0': ' ',
+    '\u200B': '',
+    '\uFEFF': '',
+    '\u2010': '-',
+    '\u2011': '-',
+    '\u2012': '-',
+    '\u2013': '-',
+    '\u2014': '-',
+    '\u2015': '-',
+    '\u2212': '-',
+    '\u2017': '-',
+})
 
 
 def _normalize_text(s: str) -> str:
@@ -27,201 +80,116 @@ def _normalize_text(s: str) -> str:
         s = s.decode('utf-8', errors='replace')
     elif not isinstance(s, str):
         s = str(s)
-    # replace common non-breaking or invisible spaces
-    s = s.replace('\u00A0', ' ').replace('\u200B', '').replace('\uFEFF', '')
-    # replace various hyphen/minus characters with ASCII hyphen
-    for ch in ('\u2010', '\u2011', '\u2012', '\u2013', '\u2014', '\u2015', '\u2212'):
-        s = s.replace(ch, '-')
-    # normalize other dash characters explicitly
-    s = s.replace('\u2014', '-').replace('\u2013', '-')
+    # fast path: pure-ASCII text has nothing to translate, and str.split()
+    # collapses whitespace exactly like the \s+ regex does for ASCII
+    if s.isascii():
+        return ' '.join(s.split())
+    # replace invisible/non-breaking spaces and hyphen variants in one pass
+    s = s.translate(_NORM_TABLE)
     # collapse whitespace
-    s = re.sub(r'\s+', ' ', s)
-    return s.strip()
+    return _WS_RE.sub(' ', s).strip()
+
 
+def _iter_digit_run_mawbs(text: str):
+    """Yield MAWBs built from the last 11 digits of each run of >=11 digits."""
+    digit_run_re = _DIGIT_RUN_RE if text.isascii() else _DIGIT_RUN_RE_UNICODE
+    for m in digit_run_re.finditer(text):
+        digits = m.group(0)
+        yield f"{digits[-11:-8]}-{digits[-8:]}"
 
-def _extract_mawb_from_text(text: str) -> Union[str, None]:
-    """Implement the user's 4-step MAWB rule on a single text block:
-    1) Check whether text contains '-'
-    2) For each numeric-left-numeric-right group (no spaces around '-'), check right has >=8 digits
-    3) Check left has >=3 digits
-    4) If satisfied, return left[-3:]-right[:8]
 
-    Returns the MAWB string (xxx-xxxxxxxx) or None.
+def _iter_hyphen_mawbs(text: str):
+    """Yield hyphen-sourced MAWBs (allow optional spaces around hyphen) in text order.
+    `text` must already be normalized by _normalize_text (dash variants mapped
+    to '-'). Candidates are not deduplicated; find() already tracks what it has seen.
     """
-    # legacy single-item extractor (kept for backward compatibility)
-    if not text:
-        return None
+    # cheap substring gate: most lines have no hyphen at all
     if '-' not in text:
-        return None
-    for m in re.finditer(r'([0-9]+)-([0-9]+)', text):
-        left = re.sub(r'\D', '', m.group(1))
-        right = re.sub(r'\D', '', m.group(2))
-        if len(right) >= 8 and len(left) >= 3:
-            return f"{left[-3:]}-{right[:8]}"
-    return None
-
-
-def _extract_all_mawbs_from_text(text: str) -> List[str]:
-    """Return all MAWB candidates found in text following the 4-step rule.
-    The returned forms are normalized to xxx-xxxxxxxx.
-    """
-    out: List[str] = []
-    if not text:
-        return out
-
-    # normalize various dash-like characters to ASCII hyphen for matching
-    norm = text
-    for ch in ('\u2010', '\u2011', '\u2012', '\u2013', '\u2014', '\u2015', '\u2212', '\u2017'):
-        norm = norm.replace(ch, '-')
-    # remove zero-width and BOM
-    norm = norm.replace('\u200B', '').replace('\uFEFF', '')
-
-    # 1) Prefer explicit 3-8 matches (allow optional spaces around hyphen)
-    pat_3_8 = re.compile(r"(?<!\d)(\d{1,})\s*-\s*(\d{1,})(?!\d)")
-    # we'll filter lengths below; this pattern finds digit-digit with hyphen
-    for m in pat_3_8.finditer(norm):
-        left = re.sub(r"\D", "", m.group(1))
-        right = re.sub(r"\D", "", m.group(2))
-        # accept if right has >=8 and left has >=3
-        if len(right) >= 8 and len(left) >= 3:
-            candidate = f"{left[-3:]}-{right[:8]}"
-            out.append(candidate)
-
-    # 2) If no hyphen-based candidates found, as a cautious fallback consider
-    #    contiguous long digit runs (no hyphen) and take last 11 digits.
-    if not out:
-        for m in re.finditer(r"\d{11,}", norm):
-            digits = m.group(0)
-            candidate = f"{digits[-11:-8]}-{digits[-8:]}"
-            out.append(candidate)
-
-    # deduplicate preserving order
-    seen_local = set()
-    res: List[str] = []
-    for c in out:
-        if c not in seen_local:
-            seen_local.add(c)
-            res.append(c)
-    return res
-
-
-def _extract_hyphen_mawbs_from_text(text: str) -> List[str]:
-    """Extract only hyphen-sourced MAWBs (allow optional spaces around hyphen).
-    This is used as the primary strategy; fallback digit-run extraction runs only
-    when no hyphen-sourced MAWBs are found in the whole document.
-    """
-    out: List[str] = []
-    if not text:
-        return out
-    norm = text
-    for ch in ('\u2010', '\u2011', '\u2012', '\u2013', '\u2014', '\u2015', '\u2212', '\u2017'):
-        norm = norm.replace(ch, '-')
-    norm = norm.replace('\u200B', '').replace('\uFEFF', '')
-    pat = re.compile(r"(?<!\d)(\d{1,})\s*-\s*(\d{1,})(?!\d)")
-    for m in pat.finditer(norm):
-        left = re.sub(r"\D", "", m.group(1))
-        right = re.sub(r"\D", "", m.group(2))
-        if len(right) >= 8 and len(left) >= 3:
-            out.append(f"{left[-3:]}-{right[:8]}")
-    # dedupe
-    seen_local = set()
-    res: List[str] = []
-    for c in out:
-        if c not in seen_local:
-            seen_local.add(c)
-            res.append(c)
-    return res
+        return
+    mawb_re = _MAWB_RE if text.isascii() else _MAWB_RE_UNICODE
+    for m in mawb_re.finditer(text):
+        yield f"{m.group(1)[-3:]}-{m.group(2)[:8]}"
 
 
 def find(path: Path):
-    """Read PDF via read(path) and find ALL MAWBs (deduplicated) and total.
+    """Stream pages via iter_pages(path) and find ALL MAWBs (deduplicated) and total.
 
     Returns (mawb_list, total_result) where
       - mawb_list is List[str] (unique MAWBs in discovery order) or []
       - total_result is (amount_string, page_number, line_number, line_text) or None
     """
-    pages = read(path)
-    if not pages:
-        return ([], None)
-
     mawb_list: List[str] = []
     seen = set()
+    # digit-run fallback candidates, used only if no hyphen-sourced MAWB is found
+    fallback_list: List[str] = []
+    fallback_seen = set()
+    total_result = None
 
-    # First pass: collect hyphen-sourced MAWBs from joined page texts and per-line.
-    for pno, page in enumerate(pages, start=1):
-        joined_space = ' '.join([_normalize_text(l) for l in page if isinstance(l, str)])
-        joined_no_space = ''.join([_normalize_text(l) for l in page if isinstance(l, str)])
-        for joined in (joined_space, joined_no_space):
-            if not joined:
-                continue
-            for mawb in _extract_hyphen_mawbs_from_text(joined):
-                if mawb not in seen:
-                    mawb_list.append(mawb)
-                    seen.add(mawb)
-
-        for lno, line in enumerate(page, start=1):
-            if not isinstance(line, str):
+    # Hot names bound to locals once (LOAD_FAST instead of global/attribute
+    # lookups inside the per-page and per-candidate loops).
+    norm_text = _normalize_text
+    iter_hyphen = _iter_hyphen_mawbs
+    iter_digit_runs = _iter_digit_run_mawbs
+    amount_search = _AMOUNT_RE.search
+    add_mawb = mawb_list.append
+    mark_seen = seen.add
+    add_fallback = fallback_list.append
+    mark_fallback_seen = fallback_seen.add
+
+    # Single pass over the streamed pages: collect hyphen-sourced MAWBs from
+    # joined page texts and per-line, and look for the first total line.
+    for pno, page in enumerate(iter_pages(path), start=1):
+        # Normalize every line once; None marks non-str lines so indexes still
+        # match `page` and the raw line can be returned in total_result.
+        norm_page = [norm_text(l) if isinstance(l, str) else None for l in page]
+        str_lines = [n for n in norm_page if n is not None]
+        joined_pair = (' '.join(str_lines), ''.join(str_lines))
+        # all lines of the page in one buffer, scanned with a single regex call
+        # per pattern instead of one call per line; the patterns never match
+        # across '\n', so this finds exactly what a per-line scan would
+        buf = '\n'.join(n or '' for n in norm_page)
+
+        for text in (*joined_pair, buf):
+            if not text:
                 continue
-            norm = _normalize_text(line)
-            if not norm:
-                continue
-            for mawb in _extract_hyphen_mawbs_from_text(norm):
+            for mawb in iter_hyphen(text):
                 if mawb not in seen:
-                    mawb_list.append(mawb)
-                    seen.add(mawb)
+                    add_mawb(mawb)
+                    mark_seen(mawb)
 
-    # If no hyphen-sourced MAWBs found, run the cautious fallback (digit-run) across the doc
-    if not mawb_list:
-        for pno, page in enumerate(pages, start=1):
-            joined_space = ' '.join([_normalize_text(l) for l in page if isinstance(l, str)])
-            joined_no_space = ''.join([_normalize_text(l) for l in page if isinstance(l, str)])
-            for joined in (joined_space, joined_no_space):
-                if not joined:
-                    continue
-                for mawb in _extract_all_mawbs_from_text(joined):
-                    if mawb not in seen:
-                        mawb_list.append(mawb)
-                        seen.add(mawb)
-            for lno, line in enumerate(page, start=1):
-                if not isinstance(line, str):
-                    continue
-                norm = _normalize_text(line)
-                if not norm:
-                    continue
-                for mawb in _extract_all_mawbs_from_text(norm):
-                    if mawb not in seen:
-                        mawb_list.append(mawb)
-                        seen.add(mawb)
-
-    # find total anywhere in document (normalized)
-    total_result = None
-    total_line_pattern = re.compile(r"\btotal\b\s*[:\-]?\s*(.+)$", re.I)
-    amount_inner_pattern = re.compile(
-        r"(?P<symbol>[€£¥$])?\s*(?P<number>[0-9][0-9,]*(?:\.[0-9]{1,2})?)\s*(?P<code>[A-Za-z]{3})?",
-        re.I,
-    )
-
-    for pno, page in enumerate(pages, start=1):
-        for lno, line in enumerate(page, start=1):
-            if not isinstance(line, str):
-                continue
-            norm = _normalize_text(line)
-            if not norm:
-                continue
-            tlm = total_line_pattern.search(norm)
+        # only run the total regex on pages that can possibly match it
+        if total_result is None and 'total' in buf.lower():
+            tlm = (_TOTAL_RE if buf.isascii() else _TOTAL_RE_UNICODE).search(buf)
             if tlm:
                 rest = tlm.group(1)
-                am = amount_inner_pattern.search(rest)
+                am = amount_search(rest)
                 if am:
                     num = am.group('number')
                     num_clean = num.replace(',', '')
                     amt = num_clean
                 else:
                     amt = rest.strip()
-                total_result = (amt, pno, lno, line)
-                break
-        if total_result:
-            break
+                # map the match offset back to its 1-based line number
+                line_starts = list(accumulate((len(n or '') + 1 for n in norm_page), initial=0))
+                lno = bisect_right(line_starts, tlm.start())
+                total_result = (amt, pno, lno, page[lno - 1])
+
+        # Cautious fallback (digit-run): pages are not kept around, so gather its
+        # candidates as we go, but only while no hyphen-sourced MAWB has been seen.
+        # Scanning the page buffer gives the same digit runs, in order, as
+        # scanning each line.
+        if not mawb_list:
+            for text in (*joined_pair, buf):
+                if not text:
+                    continue
+                for mawb in iter_digit_runs(text):
+                    if mawb not in fallback_seen:
+                        add_fallback(mawb)
+                        mark_fallback_seen(mawb)
+
+    # If no hyphen-sourced MAWBs found, use the fallback candidates for the doc
+    if not mawb_list:
+        mawb_list = fallback_list
 
     return (mawb_list, total_result)
 
@@ -1,21 +1,32 @@
 #!/usr/bin/env python3
 # coding: utf-8
+import os
 import sys
 import csv
-import re
+import json
+import logging
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 from typing import Optional
 
 # Import the format function from format.py; avoid using the name `format` directly
-try:
-    from format import format as parse_pdf
-except Exception:
-    # fallback import using importlib if needed
-    import importlib.util
-    spec = importlib.util.spec_from_file_location('fmt', Path(__file__).parent / 'format.py')
-    fmt = importlib.util.module_from_spec(spec)
-    spec.loader.exec_module(fmt)
-    parse_pdf = getattr(fmt, 'format')
+from format import format as parse_pdf, REGEX_ENGINE
+from read import default_backend
+
+logger = logging.getLogger(__name__)
+
+# str.translate table deleting every ASCII char except digits, '.' and '-'
+_AMOUNT_KEEP = '0123456789.-'
+_AMOUNT_JUNK_TABLE = str.maketrans('', '', ''.join(chr(c) for c in range(128) if chr(c) not in _AMOUNT_KEEP))
+
+# output columns; rows are written positionally in this order
+_CSV_HEADER = ('filename', 'mawb', 'total')
+
+# parse results are cached next to the output CSV; bump the version whenever
+# format.py changes what it extracts so stale entries are ignored
+_CACHE_NAME = '.mawb_cache.json'
+_CACHE_VERSION = 1
 
 
 def _safe_parse_amount(s: Optional[str]) -> Optional[float]:
@@ -30,148 +41,198 @@ def _safe_parse_amount(s: Optional[str]) -> Optional[float]:
     if s == "":
         return None
     # remove common currency symbols and spaces, keep digits, dot and minus
-    cleaned = re.sub(r"[^0-9.\-]", "", s)
+    cleaned = s.translate(_AMOUNT_JUNK_TABLE)
+    if not cleaned.isascii():
+        # rare: non-ASCII symbols/digits survive the ASCII-only table
+        cleaned = ''.join(ch for ch in cleaned if ch in _AMOUNT_KEEP)
     # guard: there should be at most one dot
     if cleaned.count('.') > 1:
         # try to keep last dot as decimal separator
-        parts = cleaned.split('.')
-        cleaned = ''.join(parts[:-1]) + '.' + parts[-1]
+        i = cleaned.rfind('.')
+        cleaned = cleaned[:i].replace('.', '') + cleaned[i:]
     try:
         return float(cleaned)
     except Exception:
         return None
 
 
+def _parse_worker(p: Path):
+    """Run parse_pdf on a single file inside a worker process.
+
+    Returns (result, error_message); exceptions are caught here so that one bad
+    PDF does not abort the whole pool.
+    """
+    try:
+        return parse_pdf(p), None
+    except Exception as e:
+        return None, str(e)
+
+
+def _write_results(writer, pdfs, results):
+    """Write CSV rows for each (pdf, (result, error)) pair, in input order."""
+    for p, (res, err) in zip(pdfs, results):
+        if err is None:
+            # Debug: raw result from format for this file (set MAWB_DEBUG=1 to see it)
+            logger.debug("format result for %s: %s", p, res)
+            # expect res to be a dict with keys 'mawb' and 'total'
+            if isinstance(res, dict):
+                mawb_field = res.get('mawb')
+                total_field = res.get('total')
+            else:
+                mawb_field = None
+                total_field = None
+        else:
+            # on error, log to stderr and write empty values
+            print(f"Error processing {p}: {err}", file=sys.stderr)
+            mawb_field = None
+            total_field = None
+        # normalize mawb_field into a list of strings
+        mawbs = []
+        if mawb_field is None:
+            mawbs = []
+        elif isinstance(mawb_field, list):
+            # ensure strings
+            mawbs = [str(m).strip() for m in mawb_field if str(m).strip() != '']
+        else:
+            # single string value
+            s = str(mawb_field).strip()
+            if s != '':
+                mawbs = [s]
+
+        # parse total to numeric if possible
+        total_value = _safe_parse_amount(total_field)
+
+        if mawbs:
+            # if numeric total available, divide evenly; otherwise leave blank
+            per_value = None
+            if total_value is not None:
+                try:
+                    per_value = total_value / len(mawbs)
+                except Exception:
+                    per_value = None
+            # format per_value as string with 2 decimals if numeric
+            per_str = f"{per_value:.2f}" if isinstance(per_value, float) else ''
+            fname = str(p)
+            writer.writerows([(fname, m, per_str) for m in mawbs])
+        else:
+            # no mawbs found: write a single row with empty mawb and original total (or parsed)
+            total_str = ''
+            if total_value is not None:
+                total_str = f"{total_value:.2f}"
+            elif total_field:
+                total_str = str(total_field)
+            writer.writerow((str(p), '', total_str))
+
+
+def _cache_key(p: Path) -> Optional[str]:
+    """Cache key for a PDF: path, size and mtime, so edited files are re-parsed."""
+    try:
+        st = p.stat()
+    except OSError:
+        return None
+    return f"{p}|{st.st_size}|{st.st_mtime_ns}"
+
+
+def _cache_version() -> str:
+    """Version stamp stored with the cache.
+
+    Besides _CACHE_VERSION it names the text extraction backend and the regex
+    engine in use, since both depend on what is installed and can change the
+    results; installing PyMuPDF or google-re2 therefore invalidates the cache.
+    """
+    return f"{_CACHE_VERSION}|{default_backend()}|{REGEX_ENGINE}"
+
+
+def _load_cache(cache_path: Path) -> dict:
+    """Load cached parse results; a missing, unreadable or outdated cache is empty."""
+    try:
+        with cache_path.open('r', encoding='utf-8') as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    if not isinstance(data, dict) or data.get('version') != _cache_version():
+        return {}
+    entries = data.get('entries')
+    return entries if isinstance(entries, dict) else {}
+
+
+def _save_cache(cache_path: Path, entries: dict):
+    """Write the cache atomically (temp file + rename); failures are only logged."""
+    tmp = cache_path.with_name(cache_path.name + '.tmp')
+    try:
+        with tmp.open('w', encoding='utf-8') as f:
+            json.dump({'version': _cache_version(), 'entries': entries}, f)
+        os.replace(tmp, cache_path)
+    except OSError as e:
+        print(f"Could not write cache {cache_path}: {e}", file=sys.stderr)
+
+
+def _merge_cached(pdfs, keys, cached, fresh, new_cache):
+    """Yield (result, error) for every pdf in order, taking cache hits from
+    `cached` and everything else from the `fresh` iterator. Successful results
+    are recorded in `new_cache`.
+    """
+    for p, key in zip(pdfs, keys):
+        if key in cached:
+            res, err = cached[key], None
+        else:
+            res, err = next(fresh)
+        if err is None and key is not None:
+            new_cache[key] = res
+        yield res, err
+
+
 def process_directory(directory: Path, out_csv: Path):
-    """Process all .pdf/.PDF files in `directory` (non-recursive) and write results to out_csv.
+    """Process all .pdf files (any case) in `directory` (non-recursive) and write results to out_csv.
 
     Behavior change: if `parse_pdf(p)` returns a dict with 'mawb' containing a list,
     write one CSV row per MAWB. The 'total' value (if numeric) will be divided evenly
     among the MAWB entries. If parsing of the total fails, each row will have an empty
     total cell.
+
+    Results are cached in `.mawb_cache.json` next to out_csv; PDFs whose path, size
+    and mtime are unchanged since the last run are not parsed again.
     """
-    files = []
-    files.extend(sorted(directory.glob('*.pdf')))
-    files.extend(sorted(directory.glob('*.PDF')))
-    # remove duplicates while preserving order
-    seen = set()
-    pdfs = []
-    for p in files:
-        sp = str(p)
-        if sp not in seen:
-            seen.add(sp)
-            pdfs.append(p)
-
-    fieldnames = ['filename', 'mawb', 'total']
+    # single directory read; the case-insensitive suffix check covers .pdf/.PDF
+    with os.scandir(directory) as it:
+        pdfs = sorted(
+            (Path(e.path) for e in it if e.name.lower().endswith('.pdf') and e.is_file()),
+            key=lambda p: p.name,
+        )
+
+    # unchanged PDFs (same path, size and mtime) reuse the previous run's result
+    cache_path = out_csv.parent / _CACHE_NAME
+    cached = _load_cache(cache_path)
+    keys = [_cache_key(p) for p in pdfs]
+    todo = [p for p, key in zip(pdfs, keys) if key not in cached]
+    # only entries for the files seen in this run are kept
+    new_cache = {}
+
     with out_csv.open('w', newline='', encoding='utf-8') as f:
-        writer = csv.DictWriter(f, fieldnames=fieldnames)
-        writer.writeheader()
-        for p in pdfs:
-            try:
-                res = parse_pdf(p)
-                # Debug: print the raw result from format for this file
-                print(f"format result for {p}: {res}")
-                # expect res to be a dict with keys 'mawb' and 'total'
-                if isinstance(res, dict):
-                    mawb_field = res.get('mawb')
-                    total_field = res.get('total')
-                else:
-                    mawb_field = None
-                    total_field = None
-            except Exception as e:
-                # on error, log to stderr and write empty values
-                print(f"Error processing {p}: {e}", file=sys.stderr)
-                mawb_field = None
-                total_field = None
-            # normalize mawb_field into a list of strings
-            mawbs = []
-            if mawb_field is None:
-                mawbs = []
-            elif isinstance(mawb_field, list):
-                # ensure strings
-                mawbs = [str(m).strip() for m in mawb_field if str(m).strip() != '']
-            else:
-                # single string value
-                s = str(mawb_field).strip()
-                if s != '':
-                    mawbs = [s]
-
-            # parse total to numeric if possible
-            total_value = _safe_parse_amount(total_field)
-
-            if mawbs:
-                # if numeric total available, divide evenly; otherwise leave blank
-                per_value = None
-                if total_value is not None:
-                    try:
-                        per_value = total_value / len(mawbs)
-                    except Exception:
-                        per_value = None
-                # format per_value as string with 2 decimals if numeric
-                per_str = f"{per_value:.2f}" if isinstance(per_value, float) else ''
-                for m in mawbs:
-                    writer.writerow({'filename': str(p), 'mawb': m, 'total': per_str})
-            else:
-                # no mawbs found: write a single row with empty mawb and original total (or parsed)
-                total_str = ''
-                if total_value is not None:
-                    total_str = f"{total_value:.2f}"
-                elif total_field:
-                    total_str = str(total_field)
-                writer.writerow({'filename': str(p), 'mawb': '', 'total': total_str})
+        writer = csv.writer(f)
+        writer.writerow(_CSV_HEADER)
+        # PDFs are parsed in parallel; rows are still written here, in order,
+        # by this single process.
+        workers = min(os.cpu_count() or 1, len(todo))
+        if workers > 1:
+            with ProcessPoolExecutor(max_workers=workers) as ex:
+                fresh = ex.map(_parse_worker, todo, chunksize=4)
+                _write_results(writer, pdfs, _merge_cached(pdfs, keys, cached, fresh, new_cache))
+        else:
+            fresh = map(_parse_worker, todo)
+            _write_results(writer, pdfs, _merge_cached(pdfs, keys, cached, fresh, new_cache))
+
+    _save_cache(cache_path, new_cache)
 
 
 def process_path(path: Path, out_csv: Path):
     """Process a Path which may be a directory or a single PDF file."""
     if path.is_file():
         # single file
-        fieldnames = ['filename', 'mawb', 'total']
         with out_csv.open('w', newline='', encoding='utf-8') as f:
-            writer = csv.DictWriter(f, fieldnames=fieldnames)
-            writer.writeheader()
-            p = path
-            try:
-                res = parse_pdf(p)
-                print(f"format result for {p}: {res}")
-                if isinstance(res, dict):
-                    mawb_field = res.get('mawb')
-                    total_field = res.get('total')
-                else:
-                    mawb_field = None
-                    total_field = None
-            except Exception as e:
-                print(f"Error processing {p}: {e}", file=sys.stderr)
-                mawb_field = None
-                total_field = None
-
-            mawbs = []
-            if mawb_field is None:
-                mawbs = []
-            elif isinstance(mawb_field, list):
-                mawbs = [str(m).strip() for m in mawb_field if str(m).strip() != '']
-            else:
-                s = str(mawb_field).strip()
-                if s:
-                    mawbs = [s]
-
-            total_value = _safe_parse_amount(total_field)
-            if mawbs:
-                per_value = None
-                if total_value is not None:
-                    try:
-                        per_value = total_value / len(mawbs)
-                    except Exception:
-                        per_value = None
-                per_str = f"{per_value:.2f}" if isinstance(per_value, float) else ''
-                for m in mawbs:
-                    writer.writerow({'filename': str(p), 'mawb': m, 'total': per_str})
-            else:
-                total_str = ''
-                if total_value is not None:
-                    total_str = f"{total_value:.2f}"
-                elif total_field:
-                    total_str = str(total_field)
-                writer.writerow({'filename': str(p), 'mawb': '', 'total': total_str})
+            writer = csv.writer(f)
+            writer.writerow(_CSV_HEADER)
+            _write_results(writer, [path], map(_parse_worker, [path]))
         return
     # otherwise treat as directory
     return process_directory(path, out_csv)
@@ -179,6 +240,8 @@ def process_path(path: Path, out_csv: Path):
 
 def main(argv: Optional[list] = None):
     argv = argv or sys.argv[1:]
+    if os.environ.get('MAWB_DEBUG'):
+        logging.basicConfig(level=logging.DEBUG)
     if len(argv) >= 1:
         directory = Path(argv[0])
     else:
@@ -198,4 +261,6 @@ def main(argv: Optional[list] = None):
 
 
 if __name__ == '__main__':
+    # required for the process pool in PyInstaller-frozen Windows builds
+    multiprocessing.freeze_support()
     raise SystemExit(main())
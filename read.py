@@ -1,34 +1,290 @@
 #!/usr/bin/env python3
 # coding: utf-8
 
-import sys
+import io
+import os
 import re
+import sys
 import json
+import functools
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+from collections import OrderedDict
+from itertools import repeat
 from pathlib import Path
-from typing import List, Union
+from typing import List, Tuple, Union
 
 try:
     from PyPDF2 import PdfReader
 except Exception:
     PdfReader = None
 
+# PyMuPDF (optional, much faster C-based extraction); newer releases prefer the
+# `pymupdf` module name, older ones only provide `fitz`
+try:
+    import pymupdf as fitz
+except Exception:
+    try:
+        import fitz
+    except Exception:
+        fitz = None
+
+BACKENDS = ("pymupdf", "pypdf2", "pdfminer")
+
+# files up to this size are read into memory once and parsed from there by
+# PyMuPDF and pdfminer (PyPDF2 already reads a file into memory when given a path)
+_MAX_IN_MEMORY_PDF = 128 * 1024 * 1024
+
+# parsed PyPDF2 readers keyed by (path, mtime_ns, size), most recently used
+# last; only filled when a caller passes reader_cache > 0
+_recent_readers: "OrderedDict[Tuple[str, int, int], PdfReader]" = OrderedDict()
+
+# tight line/char margins keep table columns of structured receipts apart
+_PDFMINER_LAPARAMS = dict(line_margin=0.1, char_margin=1.0)
+
+
+def default_backend() -> str:
+    """Return the backend used when none is given: PyMuPDF when installed, else PyPDF2."""
+    return "pymupdf" if fitz is not None else "pypdf2"
+
+
+def _resolve_backend(backend: str = None) -> str:
+    """Return the extraction backend to use: default_backend() when backend is None."""
+    if backend is None:
+        return default_backend()
+    if backend not in BACKENDS:
+        raise ValueError(f"unknown backend {backend!r}; expected one of {BACKENDS}")
+    return backend
+
 
-def extract_text_from_pdf(path: Path):
-    """Extract text from each page of a PDF and return a list of page texts."""
+def _read_small_pdf(path: Path):
+    """Return the whole file as bytes, or None if it is larger than _MAX_IN_MEMORY_PDF.
+
+    Parsing from memory reads the file once instead of seeking around it on disk,
+    which is slow on network filesystems. Not used for PyPDF2: PdfReader copies a
+    file given by path into a BytesIO itself, whatever its size.
+    """
+    if path.stat().st_size > _MAX_IN_MEMORY_PDF:
+        return None
+    return path.read_bytes()
+
+
+def _open_pypdf2(path: Path, reader_cache: int = 0):
+    """Return a PdfReader for path.
+
+    reader_cache > 0 keeps up to that many parsed readers alive (LRU), so a file
+    that is unchanged since it was last opened is not parsed again. Each reader
+    holds its whole file in memory; this only helps callers that re-read files.
+    With 0 (default) nothing is cached.
+    """
+    if reader_cache <= 0:
+        return PdfReader(str(path))
+    st = path.stat()
+    key = (str(path), st.st_mtime_ns, st.st_size)
+    reader = _recent_readers.get(key)
+    if reader is None:
+        reader = PdfReader(str(path))
+        _recent_readers[key] = reader
+    _recent_readers.move_to_end(key)
+    while len(_recent_readers) > reader_cache:
+        _recent_readers.popitem(last=False)
+    return reader
+
+
+def _open_pymupdf(path: Path):
+    data = _read_small_pdf(path)
+    if data is not None:
+        return fitz.open(stream=data, filetype="pdf")
+    return fitz.open(str(path))
+
+
+def _iter_pages_text_pypdf2(path: Path, start: int = 0, stop: int = None, reader_cache: int = 0):
     if PdfReader is None:
         raise RuntimeError("PyPDF2 is not available. Please install it: pip install PyPDF2")
 
-    reader = PdfReader(str(path))
-    texts = []
-    for i, page in enumerate(reader.pages):
+    reader = _open_pypdf2(path, reader_cache)
+    pages = reader.pages
+    for i in range(start, len(pages) if stop is None else stop):
         try:
-            text = page.extract_text()
+            text = pages[i].extract_text()
         except Exception:
             text = None
         if text is None:
             text = ""
-        texts.append(text)
-    return texts
+        yield text
+
+
+def _iter_pages_text_pymupdf(path: Path, start: int = 0, stop: int = None):
+    if fitz is None:
+        raise RuntimeError("PyMuPDF is not available. Please install it: pip install PyMuPDF")
+
+    with _open_pymupdf(path) as doc:
+        for i in range(start, len(doc) if stop is None else stop):
+            try:
+                # default "text" flags: ligatures and whitespace are kept as
+                # extracted, and glyphs without a Unicode mapping keep their raw
+                # code instead of becoming U+FFFD
+                text = doc[i].get_text("text")
+            except Exception:
+                text = None
+            if text is None:
+                text = ""
+            yield text
+
+
+def _open_pdfminer(path: Path):
+    data = _read_small_pdf(path)
+    return io.BytesIO(data) if data is not None else path.open('rb')
+
+
+@functools.lru_cache(maxsize=1)
+def _pdfminer():
+    """Import pdfminer.six on first use and return the classes used here, or None if missing.
+
+    pdfminer.six (optional, explicit backend="pdfminer") is slower, but its layout
+    analysis can be tuned for columnar receipts. It is imported lazily: importing
+    it takes tens of milliseconds, which every `import read` (including every
+    main.py pool worker) would otherwise pay for a backend it never uses.
+    """
+    try:
+        from pdfminer.converter import TextConverter
+        from pdfminer.layout import LAParams
+        from pdfminer.pdfinterp import PDFPageInterpreter, PDFResourceManager
+        from pdfminer.pdfpage import PDFPage
+    except Exception:
+        return None
+    return TextConverter, LAParams, PDFPageInterpreter, PDFResourceManager, PDFPage
+
+
+def _iter_pages_text_pdfminer(path: Path, start: int = 0, stop: int = None):
+    pdfminer = _pdfminer()
+    if pdfminer is None:
+        raise RuntimeError("pdfminer.six is not available. Please install it: pip install pdfminer.six")
+    TextConverter, LAParams, PDFPageInterpreter, PDFResourceManager, PDFPage = pdfminer
+
+    # same pipeline as pdfminer.high_level.extract_text, but the output buffer
+    # is drained after every page so pages can be yielded one at a time
+    with _open_pdfminer(path) as fp:
+        rsrcmgr = PDFResourceManager(caching=True)
+        out = io.StringIO()
+        device = TextConverter(rsrcmgr, out, laparams=LAParams(**_PDFMINER_LAPARAMS))
+        interpreter = PDFPageInterpreter(rsrcmgr, device)
+        try:
+            for i, page in enumerate(PDFPage.get_pages(fp)):
+                if i < start:
+                    continue
+                if stop is not None and i >= stop:
+                    break
+                try:
+                    interpreter.process_page(page)
+                    text = out.getvalue()
+                except Exception:
+                    text = ""
+                out.seek(0)
+                out.truncate()
+                # TextConverter ends every page with a form feed
+                if text.endswith('\f'):
+                    text = text[:-1]
+                yield text
+        finally:
+            device.close()
+
+
+_EXTRACTORS = {
+    "pymupdf": _iter_pages_text_pymupdf,
+    "pypdf2": _iter_pages_text_pypdf2,
+    "pdfminer": _iter_pages_text_pdfminer,
+}
+
+
+def _backend_available(backend: str) -> bool:
+    if backend == "pdfminer":
+        return _pdfminer() is not None
+    return (fitz if backend == "pymupdf" else PdfReader) is not None
+
+
+def _page_count(path: Path, backend: str, reader_cache: int = 0) -> int:
+    if backend == "pymupdf":
+        with _open_pymupdf(path) as doc:
+            return len(doc)
+    if backend == "pdfminer":
+        with _open_pdfminer(path) as fp:
+            return sum(1 for _ in _pdfminer()[-1].get_pages(fp))
+    return len(_open_pypdf2(path, reader_cache).pages)
+
+
+def _extract_page_range(path: str, backend: str, start: int, stop: int) -> List[str]:
+    """Worker for parallel extraction: text of pages [start, stop).
+
+    Top-level so it can be pickled; each worker process opens the document itself
+    (neither PyPDF2 readers nor MuPDF documents can be shared between workers).
+    """
+    return list(_EXTRACTORS[backend](Path(path), start, stop))
+
+
+def _iter_pages_text(path: Union[str, Path], backend: str = None, workers: int = 1,
+                     reader_cache: int = 0):
+    """Yield the extracted text of each page of a PDF, one page at a time.
+
+    workers > 1 (or 0 = one per CPU) splits the pages into contiguous ranges that
+    are extracted in separate processes; pages are still yielded in order.
+    """
+    # public entry points accept str paths; the openers below need a Path
+    path = Path(path)
+    backend = _resolve_backend(backend)
+    # when the library is missing, the serial path raises the usual error
+    if workers != 1 and _backend_available(backend):
+        count = _page_count(path, backend, reader_cache)
+        n = min(workers or os.cpu_count() or 1, count)
+        if n > 1:
+            bounds = [(count * k // n, count * (k + 1) // n) for k in range(n)]
+            starts, stops = zip(*bounds)
+            with ProcessPoolExecutor(max_workers=n) as ex:
+                for texts in ex.map(_extract_page_range, repeat(str(path), n), repeat(backend, n),
+                                    starts, stops):
+                    yield from texts
+            return
+    if backend == "pypdf2":
+        yield from _iter_pages_text_pypdf2(path, reader_cache=reader_cache)
+    else:
+        yield from _EXTRACTORS[backend](path)
+
+
+def extract_text_from_pdf(path: Union[str, Path], backend: str = None, workers: int = 1,
+                          reader_cache: int = 0):
+    """Extract text from each page of a PDF and return a list of page texts.
+
+    backend: "pymupdf", "pypdf2" or "pdfminer"; None picks PyMuPDF when it is installed,
+      else PyPDF2 (pdfminer is only used when asked for).
+    workers: processes used for page extraction; 1 (default) is serial, 0 = one per CPU.
+    reader_cache: number of parsed PyPDF2 readers kept for re-reading unchanged files
+      (0 = none, the default); see read_pdf_to_array.
+    """
+    return list(_iter_pages_text(path, backend, workers, reader_cache))
+
+
+@functools.lru_cache(maxsize=32)
+def _token_re(separators: str):
+    """Compiled regex matching each stripped, non-empty token between separators (cached).
+
+    A token is a run of non-separator, non-whitespace chars, optionally joined by
+    inner whitespace, so findall() returns exactly what splitting on the
+    separators, stripping each part and dropping empty parts would, in one pass.
+    """
+    # escape special regex chars for use inside a character class
+    escaped = ''.join(re.escape(ch) for ch in separators)
+    word = f"[^{escaped}\\s]+"
+    return re.compile(f"{word}(?:[^\\S{escaped}]+{word})*")
+
+
+# the default separator set never changes, so its tokenizer is bound once at
+# import time (no lru_cache lookup or separator hashing per call)
+DEFAULT_SEPARATORS = ",;|\t"
+_find_default_tokens = _token_re(DEFAULT_SEPARATORS).findall
+
+
+# longest token interned by read_pdf_to_array(intern_tokens=True)
+_INTERN_MAX_LEN = 32
 
 
 def split_line_by_separators(line: str, separators: str):
@@ -37,18 +293,17 @@ def split_line_by_separators(line: str, separators: str):
 
     Returns a list of stripped tokens (no surrounding whitespace) and excludes empty/whitespace-only tokens.
     """
+    if separators == DEFAULT_SEPARATORS:
+        return _find_default_tokens(line)
     if not separators:
         return [line.strip()] if line.strip() != "" else []
-    # build a character class for regex, escape special regex chars
-    escaped = ''.join(re.escape(ch) for ch in separators)
-    pattern = f"[{escaped}]"
-    # split, strip each token and filter out empty/whitespace-only tokens
-    tokens = [t.strip() for t in re.split(pattern, line)]
-    tokens = [t for t in tokens if t != ""]
-    return tokens
+    # stripped, non-empty tokens straight from the regex
+    return _token_re(separators).findall(line)
 
 
-def read_pdf_to_array(path: Union[str, Path], separators: str = None, split_tokens: bool = False) -> List:
+def read_pdf_to_array(path: Union[str, Path], separators: str = None, split_tokens: bool = False,
+                      backend: str = None, workers: int = 1, reader_cache: int = 0,
+                      intern_tokens: bool = False) -> List:
     """Read a PDF and return its content as an array.
 
     Returns: List[page], where each page is:
@@ -56,27 +311,66 @@ def read_pdf_to_array(path: Union[str, Path], separators: str = None, split_toke
       - if split_tokens is True: List[List[str]] (tokens per line)
 
     separators: string of characters to treat as separators when split_tokens=True. If None, defaults to ",;|\t".
+    backend: text extraction backend, "pymupdf", "pypdf2" or "pdfminer" (pdfminer.six with
+      layout parameters tuned for columnar receipts). If None, PyMuPDF is used when
+      installed, otherwise PyPDF2.
+    workers: number of processes extracting page text; 1 (default) is serial, 0 means one per
+      CPU. Only worth it for large PDFs, and not inside an existing per-file process pool.
+    reader_cache: PyPDF2 backend only; keep up to this many parsed readers (LRU, per
+      process) so re-reading an unchanged file skips parsing it again. Each cached reader
+      holds its whole file in memory, so leave it at 0 (default) unless files are re-read.
+    intern_tokens: with split_tokens=True, pass tokens of up to 32 chars through
+      sys.intern so repeated ones ("USD", column headers) share one str object. Off by
+      default: it costs an extra pass per line, and interned strings stay alive for the
+      life of the process (on CPython 3.12+ they are immortal), so a long-running or
+      read_pdfs worker process keeps every distinct short token it has seen.
     """
     p = Path(path)
     if not p.exists():
         raise FileNotFoundError(f"file not found: {p}")
 
-    pages_text = extract_text_from_pdf(p)
-    pages_out = []
-    sep = separators if separators is not None else ",;|\t"
+    return list(_iter_pages_out(p, separators, split_tokens, backend, workers, reader_cache,
+                                intern_tokens))
+
+
+def _iter_pages_out(p: Path, separators: str, split_tokens: bool, backend: str, workers: int = 1,
+                    reader_cache: int = 0, intern_tokens: bool = False):
+    """Return an iterator over pages in read_pdf_to_array's output form, produced
+    while the text is extracted.
+
+    Only one page's raw text is alive at a time, instead of a full list of page
+    texts next to the full output.
+    """
+    pages_text = _iter_pages_text(p, backend, workers, reader_cache)
+    if not split_tokens:
+        # plain lines (the read() path): no per-line work at all; the blank
+        # page check avoids allocating a stripped copy of the page
+        return ([] if not t or t.isspace() else t.splitlines() for t in pages_text)
+    return _tokenize_pages(pages_text, separators, intern_tokens)
+
+
+def _tokenize_pages(pages_text, separators: str, intern_tokens: bool = False):
+    """Yield List[List[str]] (tokens per line) for each page text."""
+    intern = sys.intern
+    sep = separators if separators is not None else DEFAULT_SEPARATORS
+    # resolve the token regex once instead of once per line
+    if sep == DEFAULT_SEPARATORS:
+        find_tokens = _find_default_tokens
+    else:
+        find_tokens = _token_re(sep).findall if sep else None
 
     for page_text in pages_text:
-        if page_text.strip() == "":
-            pages_out.append([])
+        if not page_text or page_text.isspace():
+            yield []
             continue
         lines = page_text.splitlines()
-        if split_tokens:
-            page_lines = [split_line_by_separators(line, sep) for line in lines]
+        if find_tokens is not None and intern_tokens:
+            yield [[intern(t) if len(t) <= _INTERN_MAX_LEN else t for t in find_tokens(line)]
+                   for line in lines]
+        elif find_tokens is not None:
+            yield [find_tokens(line) for line in lines]
         else:
-            page_lines = lines
-        pages_out.append(page_lines)
-
-    return pages_out
+            yield [split_line_by_separators(line, sep) for line in lines]
 
 
 def read(path: Union[str, Path]) -> List:
@@ -86,3 +380,92 @@ def read(path: Union[str, Path]) -> List:
     (pages -> lines). No tokenization is performed.
     """
     return read_pdf_to_array(path, separators=None, split_tokens=False)
+
+
+def iter_pages(path: Union[str, Path], backend: str = None):
+    """Like read(), but yield the pages (each a list of lines) one at a time.
+
+    Lets callers stop early or process large PDFs without holding every page.
+    """
+    p = Path(path)
+    if not p.exists():
+        raise FileNotFoundError(f"file not found: {p}")
+    yield from _iter_pages_out(p, None, False, backend)
+
+
+def read_pdfs(paths, workers: int = None, **kwargs) -> List:
+    """Read several PDFs in parallel; returns one read_pdf_to_array result per path, in order.
+
+    workers: number of processes (None = one per CPU). Extra keyword arguments are passed
+    through to read_pdf_to_array; they must be picklable, since each PDF is read in a
+    worker process (read_pdf_to_array itself is top-level for the same reason).
+    """
+    paths = [str(p) for p in paths]
+    fn = functools.partial(read_pdf_to_array, **kwargs)
+    n = min(workers or os.cpu_count() or 1, len(paths))
+    if n <= 1:
+        return [fn(p) for p in paths]
+    with ProcessPoolExecutor(max_workers=n) as ex:
+        return list(ex.map(fn, paths))
+
+
+class PageView:
+    """Tokens of one page stored as a single UTF-8 buffer plus offset arrays.
+
+    Token j is buf[tok_offsets[j]:tok_offsets[j + 1]] and line i holds tokens
+    line_offsets[i] to line_offsets[i + 1]. Tokens are decoded only on access, so a
+    page costs one bytes object and two int arrays instead of one str per token.
+    """
+    __slots__ = ('buf', 'line_offsets', 'tok_offsets')
+
+    def __init__(self, buf: bytes, line_offsets: array, tok_offsets: array):
+        self.buf = buf
+        self.line_offsets = line_offsets
+        self.tok_offsets = tok_offsets
+
+    @classmethod
+    def from_token_lines(cls, token_lines: List[List[str]]) -> "PageView":
+        """Pack a page in read_pdf_to_array(split_tokens=True) form."""
+        chunks = []
+        line_offsets = array('i', [0])
+        tok_offsets = array('i', [0])
+        pos = 0
+        for tokens in token_lines:
+            for tok in tokens:
+                b = tok.encode('utf-8', 'surrogatepass')
+                chunks.append(b)
+                pos += len(b)
+                tok_offsets.append(pos)
+            line_offsets.append(len(tok_offsets) - 1)
+        return cls(b''.join(chunks), line_offsets, tok_offsets)
+
+    def __len__(self) -> int:
+        """Number of lines on the page."""
+        return len(self.line_offsets) - 1
+
+    def token_bytes(self, j: int) -> memoryview:
+        """Raw UTF-8 bytes of token j, without copying."""
+        return memoryview(self.buf)[self.tok_offsets[j]:self.tok_offsets[j + 1]]
+
+    def token(self, j: int) -> str:
+        return self.buf[self.tok_offsets[j]:self.tok_offsets[j + 1]].decode('utf-8', 'surrogatepass')
+
+    def line(self, i: int) -> List[str]:
+        return [self.token(j) for j in range(self.line_offsets[i], self.line_offsets[i + 1])]
+
+    def tokens(self) -> List[List[str]]:
+        """Decode the whole page back to the read_pdf_to_array(split_tokens=True) form."""
+        return [self.line(i) for i in range(len(self))]
+
+
+def read_pdf_to_arrays_soa(path: Union[str, Path], separators: str = None,
+                           backend: str = None) -> List[PageView]:
+    """Like read_pdf_to_array(split_tokens=True), but each page is a compact PageView.
+
+    Pages are packed as they are extracted, so the whole document never exists as
+    nested lists of str at once.
+    """
+    p = Path(path)
+    if not p.exists():
+        raise FileNotFoundError(f"file not found: {p}")
+    return [PageView.from_token_lines(page) for page in _iter_pages_out(p, separators, True, backend)]